@@ -1,19 +1,153 @@
 import streamlit as st
 import pandas as pd
+import numpy as np
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
+import logging
 import time
-from order_book import OrderBook, Trade
+import threading
+from order_book import OrderBook, Side, TRADE_BUFFER_SIZE, to_ticks, from_ticks
 from market_maker import MarketMaker
 from random_trader import RandomTrader
+from sim_engine import SimEngine
 
 st.set_page_config(layout="wide")
 
-if "order_book" not in st.session_state:
-    st.session_state.order_book = OrderBook()
+SIM_TICK_SECONDS = 1.0
 
-if "market_participants" not in st.session_state:
-    st.session_state.market_participants = [
+logger = logging.getLogger(__name__)
+
+
+def _sim_loop(order_book, participants):
+    """Advance the simulation once per tick, independently of UI reruns."""
+    engine = SimEngine(participants)
+    while True:
+        try:
+            with order_book.lock:
+                engine.step(order_book)
+        except Exception:
+            # Keep the shared simulation alive; a failed tick is logged and skipped
+            logger.exception("Simulation tick failed")
+        time.sleep(SIM_TICK_SECONDS)
+
+
+# Chart points closer than this fraction of the visible price range (~1px) are dropped
+CHART_PRICE_TOLERANCE = 1 / 300
+
+
+def _new_price_chart():
+    fig = make_subplots(
+        rows=2,
+        cols=1,
+        row_heights=[0.7, 0.3],
+        vertical_spacing=0.05,
+        shared_xaxes=True,
+    )
+
+    fig.add_trace(
+        go.Scatter(
+            x=(),
+            y=(),
+            mode="lines",
+            name="Price",
+            line=dict(color="blue"),
+        ),
+        row=1,
+        col=1,
+    )
+
+    fig.add_trace(
+        go.Bar(
+            x=(),
+            y=(),
+            name="Volume",
+            marker_color="lightblue",
+        ),
+        row=2,
+        col=1,
+    )
+
+    fig.update_layout(
+        height=400,
+        margin=dict(l=0, r=0, t=0, b=0),
+        legend=dict(
+            orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
+        ),
+    )
+
+    fig.update_xaxes(title_text="Time", row=2, col=1)
+    fig.update_yaxes(title_text="Price", row=1, col=1)
+    fig.update_yaxes(title_text="Volume", row=2, col=1)
+
+    return fig
+
+
+def _downsample_prices(last_time, last_price, times, prices, tolerance):
+    """Drop price points that land on the same second as the previous point and
+    move it by less than `tolerance`."""
+    keep_x, keep_y = [], []
+    for t, p in zip(times, prices):
+        if t == last_time and last_price is not None and abs(p - last_price) < tolerance:
+            continue
+        keep_x.append(t)
+        keep_y.append(p)
+        last_time, last_price = t, p
+    return keep_x, keep_y
+
+
+def update_price_chart(trade_total, trade_ts, trade_price, trade_qty):
+    """Append trades executed since the last rerun to the session's figure
+    instead of rebuilding it from the whole trade history."""
+    state = st.session_state
+    if "price_fig" not in state:
+        state.price_fig = _new_price_chart()
+        state.plotted_trade_total = 0
+
+    fig = state.price_fig
+    new_count = min(trade_total - state.plotted_trade_total, len(trade_ts))
+    if new_count <= 0:
+        return fig
+
+    new_times = pd.to_datetime(trade_ts[-new_count:], unit="s").strftime("%H:%M:%S").tolist()
+    new_prices = trade_price[-new_count:].tolist()
+    new_qtys = trade_qty[-new_count:].tolist()
+
+    price_trace, volume_trace = fig.data
+    old_x, old_y = tuple(price_trace.x or ()), tuple(price_trace.y or ())
+    # At least one tick, so a flat price still collapses repeated points
+    tolerance = max(
+        CHART_PRICE_TOLERANCE * (float(trade_price.max()) - float(trade_price.min())),
+        from_ticks(1),
+    )
+    keep_x, keep_y = _downsample_prices(
+        old_x[-1] if old_x else None, old_y[-1] if old_y else None, new_times, new_prices, tolerance
+    )
+
+    # Keep the chart bounded to the same window as the trade buffer
+    price_trace.x = (old_x + tuple(keep_x))[-TRADE_BUFFER_SIZE:]
+    price_trace.y = (old_y + tuple(keep_y))[-TRADE_BUFFER_SIZE:]
+    volume_trace.x = (tuple(volume_trace.x or ()) + tuple(new_times))[-TRADE_BUFFER_SIZE:]
+    volume_trace.y = (tuple(volume_trace.y or ()) + tuple(new_qtys))[-TRADE_BUFFER_SIZE:]
+
+    state.plotted_trade_total = trade_total
+    return fig
+
+
+def build_level_table(levels):
+    """Display table for (price in ticks, quantity) levels"""
+    levels = np.array(levels, dtype=np.int64).reshape(-1, 2)
+    return pd.DataFrame(
+        {"Price": from_ticks(levels[:, 0]), "Quantity": levels[:, 1]}, copy=False
+    )
+
+
+@st.cache_resource
+def start_simulation():
+    """Create the one simulation shared by every session in this process and start
+    its tick thread. Cached, so page reloads and new tabs attach to the running
+    simulation instead of starting another thread."""
+    order_book = OrderBook()
+    participants = [
         MarketMaker(name="MM1"),
         RandomTrader(
             name="AggressiveTrader",
@@ -37,141 +171,101 @@ if "market_participants" not in st.session_state:
             price_range_bps=10,
         ),
     ]
+    threading.Thread(target=_sim_loop, args=(order_book, participants), daemon=True).start()
+    return order_book, participants
 
 
-if "last_bot_update" not in st.session_state:
-    st.session_state.last_bot_update = time.time()
+st.session_state.order_book, st.session_state.market_participants = start_simulation()
 
 
 st.title("Order Book Simulation")
-order_book = st.session_state.order_book
 
 
-placeholder = st.empty()
-trades_placeholder = st.empty()
+@st.fragment
+def render_order_form():
+    """Sidebar order entry. Submitting reruns only this fragment."""
+    order_book = st.session_state.order_book
 
-with placeholder.container():
-    main_col, trades_col = st.columns([0.8, 0.2])
+    st.header("Place Order")
+    side = st.selectbox("Side", list(Side), format_func=lambda s: s.name)
+    order_type = st.selectbox("Order Type", ["MARKET","LIMIT"])
+    price = st.number_input(
+        "Price", 
+        min_value=1, 
+        max_value=1000, 
+        value=100,
+        step=1, 
+        disabled=order_type == "MARKET"
+    )
+    quantity = st.number_input("Quantity", min_value=1, max_value=100, step=1)
 
-    with main_col:
-        current_time = time.time()
-        if current_time - st.session_state.last_bot_update >= 1:
-            for participant in st.session_state.market_participants:
-                participant.act(st.session_state.order_book)
-            st.session_state.last_bot_update = current_time
-
-        st.sidebar.header("Place Order")
-        side = st.sidebar.selectbox("Side", ["BUY", "SELL"])
-        order_type = st.sidebar.selectbox("Order Type", ["MARKET","LIMIT"])
-        price = st.sidebar.number_input(
-            "Price", 
-            min_value=1, 
-            max_value=1000, 
-            value=100,
-            step=1, 
-            disabled=order_type == "MARKET"
-        )
-        quantity = st.sidebar.number_input("Quantity", min_value=1, max_value=100, step=1)
-
-        if st.sidebar.button("Submit Order"):
+    if st.button("Submit Order"):
+        with order_book.lock:
             success, order_id = order_book.add_order_api(
                 side=side,
-                price=price if order_type == "LIMIT" else 0,
+                price=to_ticks(price) if order_type == "LIMIT" else 0,
                 quantity=quantity,
                 order_type=order_type,
                 participant_name="User",
             )
 
-            if success:
-                st.sidebar.success(f"Order Placed! Order ID: {order_id}")
-                time.sleep(0.1)
-            else:
-                st.sidebar.error(
-                    "Order rejected - no matching orders available for market order"
-                )
-
-        bids, asks = order_book.get_order_book()
+        if success:
+            st.success(f"Order Placed! Order ID: {order_id}")
+        else:
+            st.error(
+                "Order rejected - no matching orders available for market order"
+            )
 
-        # First show the price chart
-        if order_book.trades:
-            st.subheader("Price Chart")
 
-            trades_df = pd.DataFrame(
-                [(t.timestamp, t.price, t.quantity) for t in order_book.trades],
-                columns=["timestamp", "price", "quantity"],
-            )
-            
-            trades_df["formatted_time"] = pd.to_datetime(trades_df["timestamp"], unit='s').dt.strftime('%H:%M:%S')
-
-            fig = make_subplots(
-                rows=2,
-                cols=1,
-                row_heights=[0.7, 0.3],
-                vertical_spacing=0.05,
-                shared_xaxes=True,
-            )
+@st.fragment(run_every="1s")
+def render_book():
+    """Chart, order book and recent trades. The simulation runs in its own thread,
+    so this fragment only has to refresh the view."""
+    order_book = st.session_state.order_book
 
-            fig.add_trace(
-                go.Scatter(
-                    x=trades_df["formatted_time"],  
-                    y=trades_df["price"],
-                    mode="lines",
-                    name="Price",
-                    line=dict(color="blue"),
-                ),
-                row=1,
-                col=1,
-            )
+    with order_book.lock:
+        bids, asks = order_book.get_order_book()
+        # Copy while locked: before the buffer wraps these are live views the sim thread writes into
+        trade_ts, trade_ticks, trade_qty, _ = (c.copy() for c in order_book.trades_view())
+        trade_total = order_book.trade_total
+        recent_trades = list(reversed(order_book.recent_trades))
 
-            fig.add_trace(
-                go.Bar(
-                    x=trades_df["formatted_time"],  
-                    y=trades_df["quantity"],
-                    name="Volume",
-                    marker_color="lightblue",
-                ),
-                row=2,
-                col=1,
-            )
+    trade_price = from_ticks(trade_ticks)
 
-            fig.update_layout(
-                height=400,
-                margin=dict(l=0, r=0, t=0, b=0),
-                legend=dict(
-                    orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
-                ),
-            )
+    main_col, trades_col = st.columns([0.8, 0.2])
 
-            fig.update_xaxes(title_text="Time", row=2, col=1)
-            fig.update_yaxes(title_text="Price", row=1, col=1)
-            fig.update_yaxes(title_text="Volume", row=2, col=1)
+    with main_col:
+        # First show the price chart
+        if len(trade_ts):
+            st.subheader("Price Chart")
 
-            st.plotly_chart(fig, use_container_width=True)
+            fig = update_price_chart(trade_total, trade_ts, trade_price, trade_qty)
+            st.plotly_chart(fig, use_container_width=True, key="chart")
 
         st.subheader("Order Book")
         book_col1, book_col2 = st.columns(2)
 
         with book_col1:
             st.write("### Buy Orders")
-            bid_df = pd.DataFrame(bids, columns=["Price", "Quantity"])
+            bid_df = build_level_table(tuple(bids))
             st.table(bid_df)
 
         with book_col2:
             st.write("### Sell Orders")
-            ask_df = pd.DataFrame(asks, columns=["Price", "Quantity"])
+            ask_df = build_level_table(tuple(asks))
             st.table(ask_df)
 
     with trades_col:
-        if order_book.trades:
+        if recent_trades:
             st.subheader("Recent Trades")
-            recent_trades = order_book.trades[-10:][::-1] 
             trade_df = pd.DataFrame(
-                [(t.quantity, t.price, "BUY" if t.side == "BUY" else "SELL") for t in recent_trades],
+                [(t.quantity, from_ticks(t.price), t.side.name) for t in recent_trades],
                 columns=["Quantity", "Price", "Side"],
             )
             st.table(trade_df)
 
-st.empty()
-time.sleep(1)
-st.rerun()
 
+with st.sidebar:
+    render_order_form()
+
+render_book()
@@ -1,8 +1,10 @@
 import time
-import random
-import statistics
-from typing import Tuple, List, Dict
+import math
+import numpy as np
+from collections import deque
+from typing import Tuple, Dict
 from market_participants import MarketParticipant
+from order_book import Side, TICKS_PER_UNIT, from_ticks
 
 
 class MarketMaker(MarketParticipant):
@@ -37,8 +39,15 @@ class MarketMaker(MarketParticipant):
         self.inventory_risk_factor = inventory_risk_factor
         self.volatility_sensitivity = volatility_sensitivity
 
+        # Offset of each quote level from mid as a multiple of the spread:
+        # half a spread for the first level, then spread / num_levels further per level
+        self._level_mults = np.arange(num_levels, dtype=np.float64) / num_levels + 0.5
+
         self.inventory = 0
-        self.price_history: List[float] = []
+        # Rolling window of mid-prices with running sums for O(1) volatility updates
+        self.price_history: deque = deque(maxlen=volatility_window)
+        self._price_sum = 0.0
+        self._price_sum_sq = 0.0
 
     def act(self, order_book) -> None:
         """
@@ -50,6 +59,7 @@ class MarketMaker(MarketParticipant):
         mid_price = order_book.get_mid_price()
         if mid_price is None:
             return
+        mid_price = from_ticks(mid_price)
 
         self.update_price_history(mid_price)
 
@@ -72,18 +82,24 @@ class MarketMaker(MarketParticipant):
         """
         Keep a rolling window of mid-prices to estimate volatility.
         """
+        if len(self.price_history) == self.price_history.maxlen:
+            evicted = self.price_history[0]
+            self._price_sum -= evicted
+            self._price_sum_sq -= evicted * evicted
         self.price_history.append(mid_price)
-        if len(self.price_history) > self.volatility_window:
-            self.price_history.pop(0)
+        self._price_sum += mid_price
+        self._price_sum_sq += mid_price * mid_price
 
     def calculate_volatility(self) -> float:
         """
         Basic volatility measure: standard deviation of mid-prices in the recent window.
         Returns 0 if not enough data.
         """
-        if len(self.price_history) < 2:
+        n = len(self.price_history)
+        if n < 2:
             return 0.0
-        return statistics.pstdev(self.price_history)
+        mean = self._price_sum / n
+        return math.sqrt(max(0.0, self._price_sum_sq / n - mean * mean))
 
     def calculate_spread(self, current_vol: float) -> float:
         """
@@ -102,50 +118,35 @@ class MarketMaker(MarketParticipant):
     def place_quotes(self, order_book, mid_price: float, spread: float):
         """
         Place multiple levels of buy (bid) and sell (ask) orders around the mid_price.
+        All levels are computed at once and each side goes into the book in one bulk call.
+        Quotes are computed in price units and rounded to ticks once, after the inventory skew.
         """
-        half_spread = spread / 2.0
-
-        for level in range(self.num_levels):
-
-            offset = half_spread + (level * (spread / self.num_levels))
-
-            bid_price = round(mid_price - offset, 2)
-            ask_price = round(mid_price + offset, 2)
+        offsets = spread * self._level_mults
+        bid_prices = mid_price - offsets
+        ask_prices = mid_price + offsets
 
-            size = random.randint(*self.size_range)
+        sizes = np.random.randint(self.size_range[0], self.size_range[1] + 1, self.num_levels)
 
-            if self.inventory > 0:
-                bid_price -= (self.inventory / self.inventory_limit) * 0.1
-            elif self.inventory < 0:
-                ask_price += (abs(self.inventory) / self.inventory_limit) * 0.1
+        if self.inventory > 0:
+            bid_prices -= (self.inventory / self.inventory_limit) * 0.1
+        elif self.inventory < 0:
+            ask_prices += (abs(self.inventory) / self.inventory_limit) * 0.1
 
-            success, bid_id = order_book.add_order_api(
-                side="BUY",
-                price=bid_price,
-                quantity=size,
-                order_type="LIMIT",
-                participant_name=self.name,
-            )
-            if success and bid_id is not None:
-                self.active_orders[bid_id] = order_book.order_map[bid_id]
+        bid_ticks = np.rint(bid_prices * TICKS_PER_UNIT).astype(np.int64)
+        ask_ticks = np.rint(ask_prices * TICKS_PER_UNIT).astype(np.int64)
 
-            success, ask_id = order_book.add_order_api(
-                side="SELL",
-                price=ask_price,
-                quantity=size,
-                order_type="LIMIT",
-                participant_name=self.name,
-            )
-            if success and ask_id is not None:
-                self.active_orders[ask_id] = order_book.order_map[ask_id]
+        for side, ticks in ((Side.BUY, bid_ticks), (Side.SELL, ask_ticks)):
+            order_ids = order_book.add_orders_bulk(side, ticks, sizes, self.name)
+            for order_id in order_ids:
+                self.active_orders[order_id] = order_book.order_map[order_id]
 
-    def update_inventory(self, filled_quantity: int, side: str):
+    def update_inventory(self, filled_quantity: int, side: Side):
         """
         If the MarketMaker's orders are filled, we should update inventory.
         - For a filled BUY, inventory increases.
         - For a filled SELL, inventory decreases.
         """
-        if side == "BUY":
+        if side == Side.BUY:
             self.inventory += filled_quantity
-        elif side == "SELL":
+        elif side == Side.SELL:
             self.inventory -= filled_quantity
@@ -1,52 +1,129 @@
-import heapq
+import bisect
+import threading
 import time
+from collections import deque
+import numpy as np
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import List, Dict, Tuple, Optional, NamedTuple
 
 
-@dataclass
+class Side(IntEnum):
+    BUY = 0
+    SELL = 1
+
+
+# OPPOSITE[side] is the side an incoming order trades against
+OPPOSITE = (Side.SELL, Side.BUY)
+
+# Index of the best price in a side's ascending price list: highest bid, lowest ask
+BEST_INDEX = (-1, 0)
+
+
+@dataclass(slots=True, eq=False)
 class Order:
     order_id: int
-    side: str
-    price: float
+    side: Side
+    price: int  # in ticks, see TICKS_PER_UNIT
     quantity: int
     order_type: str
-    timestamp: float
+    timestamp: int  # time.monotonic_ns() at submission, used for time priority only
     participant_name: str
 
-    def __lt__(self, other):
-
-        return self.timestamp < other.timestamp
-
     def __repr__(self):
-        return f"Order({self.order_id}, {self.side}, {self.price}, {self.quantity}, {self.order_type}, {self.participant_name})"
+        return f"Order({self.order_id}, {self.side.name}, {self.price}, {self.quantity}, {self.order_type}, {self.participant_name})"
 
 
 class Trade(NamedTuple):
     timestamp: float
-    price: float
+    price: int
     quantity: int
-    side: str
+    side: Side
+
+
+# Prices inside the book are integer ticks (cents) so they compare and hash exactly
+TICKS_PER_UNIT = 100
+
+
+def to_ticks(price: float) -> int:
+    """Convert a price in currency units to the nearest tick"""
+    return int(round(price * TICKS_PER_UNIT))
+
+
+def from_ticks(ticks: float) -> float:
+    """Convert a price in ticks back to currency units"""
+    return ticks / TICKS_PER_UNIT
+
+
+TRADE_BUFFER_SIZE = 65536
+
+# Number of most recent trades kept as Trade tuples for display
+RECENT_TRADES_SIZE = 10
 
 
 class OrderBook:
     def __init__(self):
-        self.bids = []
-        self.asks = []
+        # Everything below is indexed by Side. Distinct resting prices are kept sorted
+        # ascending, orders live in FIFO queues per price level with a running total
+        # quantity per level.
+        self.sorted_prices: List[List[int]] = [[], []]
+        self.levels: List[Dict[int, deque]] = [{}, {}]
+        self.level_qty: List[Dict[int, int]] = [{}, {}]
         self.order_map = {}
-        self.trades: List[Trade] = []
+
+        # Trade history as a fixed-size ring buffer of column arrays; oldest trades are overwritten
+        self._trade_ts = np.empty(TRADE_BUFFER_SIZE, dtype=np.float64)
+        self._trade_price = np.empty(TRADE_BUFFER_SIZE, dtype=np.int64)
+        self._trade_qty = np.empty(TRADE_BUFFER_SIZE, dtype=np.int32)
+        self._trade_side = np.empty(TRADE_BUFFER_SIZE, dtype=np.int8)
+        self._trade_head = 0
+        self._trade_count = 0
+        self._trade_total = 0
+        self.recent_trades: deque = deque(maxlen=RECENT_TRADES_SIZE)
+
         self.next_order_id = 1
-        self.last_trade_price = 100.0
+        self.last_trade_price = to_ticks(100.0)
+
+        # Bumped on every mutation so repeated reads within a tick reuse one snapshot
+        self._version = 0
+        self._book_cache = (None, None, None)
+        self._mid_cache = (None, None)
+
+        # Held by whoever mutates or reads the book when the simulation runs in a background thread
+        self.lock = threading.Lock()
+
+    def _add_to_level(self, order: Order):
+        prices, levels, level_qty = self.sorted_prices[order.side], self.levels[order.side], self.level_qty[order.side]
+        if order.price not in levels:
+            bisect.insort(prices, order.price)
+            levels[order.price] = deque()
+            level_qty[order.price] = 0
+        levels[order.price].append(order)
+        level_qty[order.price] += order.quantity
+
+    def _drop_level(self, side: Side, price: int):
+        prices = self.sorted_prices[side]
+        del self.levels[side][price]
+        del self.level_qty[side][price]
+        del prices[bisect.bisect_left(prices, price)]
+
+    def _peek(self, side: Side) -> Optional[Order]:
+        """Return the oldest order at the best price on `side`. Levels are dropped as soon
+        as they empty, so the best level always has an order at its front."""
+        prices = self.sorted_prices[side]
+        if not prices:
+            return None
+        return self.levels[side][prices[BEST_INDEX[side]]][0]
 
     def add_order_api(
         self,
-        side: str,
-        price: float,
+        side: Side,
+        price: int,
         quantity: int,
         order_type: str,
         participant_name: str,
     ) -> Tuple[bool, Optional[int]]:
-        """Universal API for adding orders to the book"""
+        """Universal API for adding orders to the book. Prices are in ticks."""
         order_id = self.next_order_id
         self.next_order_id += 1
 
@@ -56,112 +133,187 @@ class OrderBook:
             price=price,
             quantity=quantity,
             order_type=order_type,
-            timestamp=time.time(),
+            timestamp=time.monotonic_ns(),
             participant_name=participant_name,
         )
 
         success = self.add_order(order)
         return success, order_id if success else None
 
+    def add_orders_bulk(
+        self,
+        side: Side,
+        prices: np.ndarray,
+        quantities: np.ndarray,
+        participant_name: str,
+    ) -> List[int]:
+        """Add several limit orders for one side and match once at the end.
+        Prices are in ticks; any array-like works for prices and quantities.
+        Returns the new order ids in input order."""
+        prices = np.asarray(prices, dtype=np.int64)
+        quantities = np.asarray(quantities, dtype=np.int64)
+        if len(prices) != len(quantities):
+            raise ValueError("prices and quantities must have the same length")
+        now = time.time()
+        timestamp = time.monotonic_ns()
+        first_id = self.next_order_id
+        order_ids = list(range(first_id, first_id + len(prices)))
+        self.next_order_id += len(order_ids)
+
+        for order_id, price, quantity in zip(order_ids, prices.tolist(), quantities.tolist()):
+            order = Order(
+                order_id=order_id,
+                side=side,
+                price=price,
+                quantity=quantity,
+                order_type="LIMIT",
+                timestamp=timestamp,
+                participant_name=participant_name,
+            )
+            self._add_to_level(order)
+            self.order_map[order_id] = order
+
+        self._version += 1
+        self.match_orders(now)
+        return order_ids
+
     def add_order(self, order: Order) -> bool:
+        # One wall-clock stamp for every trade this order triggers
+        now = time.time()
         if order.order_type == "MARKET":
-            success = self._handle_market_order(order)
+            success = self._handle_market_order(order, now)
             if not success:
                 return False
         else:
-            if order.side == "BUY":
-                heapq.heappush(self.bids, (-order.price, order.timestamp, order))
-            else:
-                heapq.heappush(self.asks, (order.price, order.timestamp, order))
+            self._add_to_level(order)
             self.order_map[order.order_id] = order
-            self.match_orders()
+            self._version += 1
+            self.match_orders(now)
         return True
 
-    def _handle_market_order(self, market_order: Order) -> bool:
+    def _handle_market_order(self, market_order: Order, now: float) -> bool:
         """Handle market order execution."""
-        if market_order.side == "BUY":
-            if not self.asks:
-                return False
-            while market_order.quantity > 0 and self.asks:
-                best_ask = self.asks[0][2]
-                trade_quantity = min(market_order.quantity, best_ask.quantity)
-                trade_price = best_ask.price
-                self.trades.append(Trade(time.time(), trade_price, trade_quantity, "BUY"))
-                self.last_trade_price = trade_price
-
-                best_ask.quantity -= trade_quantity
-                market_order.quantity -= trade_quantity
-
-                if best_ask.quantity == 0:
-                    heapq.heappop(self.asks)
-            return True
-        else:
-            if not self.bids:
-                return False
-            while market_order.quantity > 0 and self.bids:
-                best_bid = self.bids[0][2]
-                trade_quantity = min(market_order.quantity, best_bid.quantity)
-                trade_price = best_bid.price
-                self.trades.append(Trade(time.time(), trade_price, trade_quantity, "SELL"))
-                self.last_trade_price = trade_price
+        self._version += 1
+        resting_side = OPPOSITE[market_order.side]
+        if self._peek(resting_side) is None:
+            return False
+        while market_order.quantity > 0:
+            best = self._peek(resting_side)
+            if best is None:
+                break
+            trade_quantity = min(market_order.quantity, best.quantity)
+            self._record_trade(now, best.price, trade_quantity, market_order.side)
+            self.last_trade_price = best.price
 
-                best_bid.quantity -= trade_quantity
-                market_order.quantity -= trade_quantity
+            self._fill_resting(best, trade_quantity)
+            market_order.quantity -= trade_quantity
+        return True
 
-                if best_bid.quantity == 0:
-                    heapq.heappop(self.bids)
-            return True
+    def _fill_resting(self, order: Order, quantity: int):
+        """Take `quantity` off a resting order at the front of its level"""
+        order.quantity -= quantity
+        self.level_qty[order.side][order.price] -= quantity
+        if order.quantity == 0:
+            level = self.levels[order.side][order.price]
+            level.popleft()
+            if not level:
+                self._drop_level(order.side, order.price)
 
-    def match_orders(self):
+    def match_orders(self, now: Optional[float] = None):
         """Match buy and sell orders based on price priority."""
-        while self.bids and self.asks:
-            best_bid = self.bids[0][2]
-            best_ask = self.asks[0][2]
+        if now is None:
+            now = time.time()
+        while True:
+            best_bid = self._peek(Side.BUY)
+            best_ask = self._peek(Side.SELL)
+            if best_bid is None or best_ask is None:
+                break
 
             if best_bid.price >= best_ask.price:
                 trade_quantity = min(best_bid.quantity, best_ask.quantity)
                 trade_price = best_ask.price
-                trade_side = "BUY" if best_bid.timestamp > best_ask.timestamp else "SELL"
-                self.trades.append(Trade(time.time(), trade_price, trade_quantity, trade_side))
+                trade_side = Side.BUY if best_bid.timestamp > best_ask.timestamp else Side.SELL
+                self._version += 1
+                self._record_trade(now, trade_price, trade_quantity, trade_side)
                 self.last_trade_price = trade_price
 
-                best_bid.quantity -= trade_quantity
-                best_ask.quantity -= trade_quantity
-
-                if best_bid.quantity == 0:
-                    heapq.heappop(self.bids)
-                if best_ask.quantity == 0:
-                    heapq.heappop(self.asks)
+                self._fill_resting(best_bid, trade_quantity)
+                self._fill_resting(best_ask, trade_quantity)
             else:
                 break
 
-    def get_order_book(self) -> Tuple[List[Tuple[float, int]], List[Tuple[float, int]]]:
-        """Return current order book state as (bids, asks)"""
-        bids = sorted([(-p, o.quantity) for p, _, o in self.bids], reverse=True)
-        asks = sorted([(p, o.quantity) for p, _, o in self.asks])
+    def _record_trade(self, timestamp: float, price: int, quantity: int, side: Side):
+        i = self._trade_head
+        self._trade_ts[i] = timestamp
+        self._trade_price[i] = price
+        self._trade_qty[i] = quantity
+        self._trade_side[i] = side
+        self.recent_trades.append(Trade(timestamp, price, quantity, side))
+        self._trade_head = (i + 1) % TRADE_BUFFER_SIZE
+        self._trade_count = min(self._trade_count + 1, TRADE_BUFFER_SIZE)
+        self._trade_total += 1
+
+    @property
+    def trade_count(self) -> int:
+        """Number of trades currently held in the trade buffer"""
+        return self._trade_count
+
+    @property
+    def trade_total(self) -> int:
+        """Number of trades executed since the book was created, including ones overwritten in the buffer"""
+        return self._trade_total
+
+    def trades_view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Return (timestamps, prices, quantities, sides) of the buffered trades, oldest first.
+        Prices are in ticks and sides are Side values."""
+        columns = (self._trade_ts, self._trade_price, self._trade_qty, self._trade_side)
+        if self._trade_count < TRADE_BUFFER_SIZE:
+            return tuple(c[: self._trade_count] for c in columns)
+        head = self._trade_head
+        return tuple(np.concatenate((c[head:], c[:head])) for c in columns)
+
+    def get_order_book(self) -> Tuple[List[Tuple[int, int]], List[Tuple[int, int]]]:
+        """Return current order book state as (bids, asks) of (price in ticks, quantity)"""
+        if self._book_cache[0] == self._version:
+            return self._book_cache[1:]
+        bid_qty, ask_qty = self.level_qty[Side.BUY], self.level_qty[Side.SELL]
+        bids = [(p, bid_qty[p]) for p in reversed(self.sorted_prices[Side.BUY])]
+        asks = [(p, ask_qty[p]) for p in self.sorted_prices[Side.SELL]]
+        self._book_cache = (self._version, bids, asks)
         return bids, asks
 
     def get_mid_price(self) -> float:
-        """Get current mid price or last trade price if book is empty"""
+        """Get current mid price or last trade price if book is empty, in ticks.
+        Can fall on a half tick."""
+        if self._mid_cache[0] == self._version:
+            return self._mid_cache[1]
         bids, asks = self.get_order_book()
         if bids and asks:
-            return (bids[0][0] + asks[0][0]) / 2
-        return self.last_trade_price
+            mid_price = (bids[0][0] + asks[0][0]) / 2
+        else:
+            mid_price = self.last_trade_price
+        self._mid_cache = (self._version, mid_price)
+        return mid_price
 
     def cancel_order(self, order_id: int) -> bool:
         """Cancel an existing order"""
         if order_id not in self.order_map:
             return False
 
-        order = self.order_map[order_id]
-
-        del self.order_map[order_id]
+        order = self.order_map.pop(order_id)
+        self._version += 1
 
-        if order.side == "BUY":
-            self.bids = [(p, t, o) for p, t, o in self.bids if o.order_id != order_id]
-            heapq.heapify(self.bids)
-        else:
-            self.asks = [(p, t, o) for p, t, o in self.asks if o.order_id != order_id]
-            heapq.heapify(self.asks)
+        # Levels are short FIFO queues, so removing the order in place is cheap and
+        # keeps fully cancelled levels from lingering.
+        level = self.levels[order.side].get(order.price)
+        if level is not None:
+            try:
+                level.remove(order)
+            except ValueError:
+                # Already filled and dequeued
+                return True
+            self.level_qty[order.side][order.price] -= order.quantity
+            if not level:
+                self._drop_level(order.side, order.price)
 
         return True
@@ -1,9 +1,13 @@
+import math
 import time
 import random
 import numpy as np
 from typing import Optional, Dict
 from market_participants import MarketParticipant
-from order_book import Order
+from order_book import Order, Side
+
+# Number of random variates drawn per refill of a trader's RNG buffers
+RNG_BATCH_SIZE = 1024
 
 
 class RandomTrader(MarketParticipant):
@@ -22,15 +26,26 @@ class RandomTrader(MarketParticipant):
         self.price_range_bps = price_range_bps
         self.last_trade_time = time.time()
 
+        # Power-law sizes and beta price offsets are drawn in batches and consumed one
+        # at a time. Uniforms come straight from random.random(), which is already
+        # cheaper than indexing into a buffer.
+        self._rng = np.random.default_rng()
+        self._size_buf, self._size_i = self._rng.power(2.5, RNG_BATCH_SIZE).tolist(), 0
+        self._beta_buy_buf, self._beta_buy_i = self._rng.beta(2.0, 5.0, RNG_BATCH_SIZE).tolist(), 0
+        self._beta_sell_buf, self._beta_sell_i = self._rng.beta(5.0, 2.0, RNG_BATCH_SIZE).tolist(), 0
+
     def generate_order_size(self) -> int:
         """
         Generate realistic order sizes using a power law distribution.
         This creates many small orders and few large orders.
         """
 
-        alpha = 2.5
+        if self._size_i >= RNG_BATCH_SIZE:
+            self._size_buf, self._size_i = self._rng.power(2.5, RNG_BATCH_SIZE).tolist(), 0
+        draw = self._size_buf[self._size_i]
+        self._size_i += 1
 
-        size = int(np.random.power(alpha) * self.max_order_size)
+        size = int(draw * self.max_order_size)
         return max(1, size)
 
     def should_trade(self) -> bool:
@@ -43,27 +58,30 @@ class RandomTrader(MarketParticipant):
         trade_probability = 1 - np.exp(-time_since_last / self.mean_time_between_trades)
         return random.random() < trade_probability
 
-    def generate_limit_price(self, mid_price: float, side: str) -> float:
+    def generate_limit_price(self, mid_price: float, side: Side) -> int:
         """
-        Generate a limit price near the mid price.
+        Generate a limit price in ticks near the mid price (also in ticks).
         Uses a beta distribution to cluster prices near the best bid/ask.
+        Buys round down and sells round up so neither lands on the wrong side of mid.
         """
 
-        if side == "BUY":
-            a, b = 2.0, 5.0
+        if side == Side.BUY:
+            if self._beta_buy_i >= RNG_BATCH_SIZE:
+                self._beta_buy_buf, self._beta_buy_i = self._rng.beta(2.0, 5.0, RNG_BATCH_SIZE).tolist(), 0
+            beta = self._beta_buy_buf[self._beta_buy_i]
+            self._beta_buy_i += 1
         else:
-            a, b = 5.0, 2.0
-
-        deviation_bps = random.betavariate(a, b) * self.price_range_bps
+            if self._beta_sell_i >= RNG_BATCH_SIZE:
+                self._beta_sell_buf, self._beta_sell_i = self._rng.beta(5.0, 2.0, RNG_BATCH_SIZE).tolist(), 0
+            beta = self._beta_sell_buf[self._beta_sell_i]
+            self._beta_sell_i += 1
+        deviation_bps = beta * self.price_range_bps
 
-        adjustment = (deviation_bps / 10000) * mid_price
-
-        if side == "BUY":
-            price = mid_price - adjustment
-        else:
-            price = mid_price + adjustment
+        adjustment = deviation_bps * mid_price / 10000
 
-        return round(price, 2)
+        if side == Side.BUY:
+            return math.floor(mid_price - adjustment)
+        return math.ceil(mid_price + adjustment)
 
     def act(self, order_book) -> None:
         """
@@ -72,11 +90,15 @@ class RandomTrader(MarketParticipant):
         if not self.should_trade():
             return
 
+        self.place_order(order_book)
+
+    def place_order(self, order_book) -> None:
+        """
+        Place one market or limit order now, without the should_trade check.
+        """
         mid_price = order_book.get_mid_price()
-        if mid_price is None:
-            return
 
-        side = random.choice(["BUY", "SELL"])
+        side = Side.BUY if random.random() < 0.5 else Side.SELL
 
         size = self.generate_order_size()
 
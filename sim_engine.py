@@ -0,0 +1,44 @@
+import time
+import numpy as np
+from typing import List
+from market_participants import MarketParticipant
+from random_trader import RandomTrader
+
+
+class SimEngine:
+    def __init__(self, participants: List[MarketParticipant]):
+        """
+        Advances all participants by one tick. The "trade this tick?" decision of every
+        RandomTrader is drawn as one array up front, so only the traders that actually
+        trade are visited in Python; their orders come from RandomTrader.place_order.
+        Every other participant still gets its own act() call.
+
+        :param participants: Participants in the order they should act each tick
+        """
+        # (participant, index into self.traders or None), in acting order
+        self.traders: List[RandomTrader] = []
+        self._schedule = []
+        for participant in participants:
+            if isinstance(participant, RandomTrader):
+                self._schedule.append((participant, len(self.traders)))
+                self.traders.append(participant)
+            else:
+                self._schedule.append((participant, None))
+
+        self.mean_dt = np.array([t.mean_time_between_trades for t in self.traders], dtype=np.float64)
+
+        self._rng = np.random.default_rng()
+
+    def step(self, order_book) -> None:
+        # Same Poisson process as RandomTrader.should_trade, for all traders at once.
+        # Last trade times are read fresh so trades placed outside the engine count too.
+        now = time.time()
+        last_t = np.array([t.last_trade_time for t in self.traders], dtype=np.float64)
+        trade_probability = 1 - np.exp(-(now - last_t) / self.mean_dt)
+        trades_now = self._rng.random(len(self.traders)) < trade_probability
+
+        for participant, trader_index in self._schedule:
+            if trader_index is None:
+                participant.act(order_book)
+            elif trades_now[trader_index]:
+                participant.place_order(order_book)